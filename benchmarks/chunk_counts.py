@@ -0,0 +1,85 @@
+"""
+Chunk-count regression check for table row packing on files/input.pdf.
+
+Parses and cleans the PDF once, then chunks it the legacy way (one chunk per
+table row, no merging) and the packed way (rows packed per chunk, then the
+undersized-chunk merge step the pipeline runs after de-duplication), and
+reports chunk counts and token sizes for both. Exits non-zero if packing
+produces more chunks than the legacy way, or if any packed table chunk or
+merged chunk exceeds the chunker's pack_tokens (the embedder window, capped at
+CHUNK_TOKENS) by more than a few tokens of re-tokenization slack.
+
+    python benchmarks/chunk_counts.py [path/to/file.pdf]
+"""
+import argparse
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from ingestion.parser import PDFParser
+from ingestion.chunker import MarkdownChunker
+
+# Chunks are built from token ids and decoded back to text; re-encoding that text
+# can come out a few tokens longer (e.g. around punctuation and line breaks)
+RETOKENIZE_SLACK = 8
+
+
+def token_sizes(chunker: MarkdownChunker, chunks: list) -> list:
+    return [len(chunker.tokenizer.encode(c, add_special_tokens=False)) for c in chunks]
+
+
+def report(name: str, chunker: MarkdownChunker, chunks: list):
+    sizes = token_sizes(chunker, chunks)
+    undersized = sum(1 for n in sizes if n < chunker.min_tokens)
+    print(f"{name:>6}: {len(chunks):>5} chunks, mean {sum(sizes) / max(len(sizes), 1):.0f} tokens, "
+          f"max {max(sizes, default=0)}, under {chunker.min_tokens} tokens {undersized}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare chunk counts for row vs packed table chunking.")
+    parser.add_argument("pdf_path", nargs="?", default=str(ROOT / "files" / "input.pdf"), help="PDF to chunk.")
+    args = parser.parse_args()
+
+    pdf = PDFParser(args.pdf_path)
+    if not pdf.extract_to_markdown():
+        print("Failed to extract markdown from PDF.")
+        sys.exit(1)
+    cleaned_md = pdf.clean_markdown()
+
+    legacy = MarkdownChunker(table_mode="row", merge_small=False)
+    before_chunks = legacy.markdown_to_chunks(cleaned_md)
+    report("before", legacy, before_chunks)
+
+    packer = MarkdownChunker(table_mode="pack", merge_small=True)
+    packed_chunks = packer.markdown_to_chunks(cleaned_md)
+    after_chunks, _ = packer.merge_small_chunks(packed_chunks)
+    report("after", packer, after_chunks)
+
+    before, after = len(before_chunks), len(after_chunks)
+    print(f"Chunks before: {before}, after: {after} ({100.0 * (before - after) / max(before, 1):.1f}% fewer)")
+
+    # Prose windows are still sized by CHUNK_TOKENS; only table chunks and chunks
+    # produced by merging are bounded by pack_tokens
+    table_chunks = [c for block in packer.split_blocks(cleaned_md) if '|' in block
+                    for c in packer.table_chunks_packed(block)]
+    unmerged = set(packed_chunks)
+    merged_chunks = [c for c in after_chunks if c not in unmerged]
+
+    failures = []
+    if after > before:
+        failures.append("packed mode produced more chunks than row mode")
+    limit = packer.pack_tokens + RETOKENIZE_SLACK
+    for name, chunks in (("packed table", table_chunks), ("merged", merged_chunks)):
+        oversized = [n for n in token_sizes(packer, chunks) if n > limit]
+        if oversized:
+            failures.append(f"{len(oversized)} {name} chunks exceed {limit} tokens (pack_tokens={packer.pack_tokens})")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
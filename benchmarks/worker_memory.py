@@ -0,0 +1,98 @@
+"""
+Measure per-worker memory as the gunicorn worker count grows.
+
+For each worker count, starts `gunicorn main:app -c gunicorn.conf.py`, waits for
+the API to answer, and reports RSS and PSS (proportional set size, which splits
+shared pages between the processes mapping them) for the master and every
+worker. With preloaded models the worker PSS stays small while RSS shows the
+full shared model footprint. Linux only (reads /proc).
+
+    python benchmarks/worker_memory.py --workers 1 2 4 8
+"""
+import argparse
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def read_memory_kb(pid: int) -> dict:
+    """Return {'rss': kB, 'pss': kB} for a process from /proc/<pid>/smaps_rollup."""
+    mem = {"rss": 0, "pss": 0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                mem[key.lower()] = int(value.split()[0])
+    return mem
+
+
+def child_pids(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_until_ready(url: str, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).ok:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    return False
+
+
+def measure(n_workers: int, port: int, timeout: float) -> dict:
+    env = dict(os.environ, WEB_CONCURRENCY=str(n_workers), BIND=f"127.0.0.1:{port}")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_ready(f"http://127.0.0.1:{port}/", timeout):
+            raise RuntimeError(f"gunicorn with {n_workers} workers did not become ready in {timeout}s")
+        # Give every worker time to finish booting before sampling
+        deadline = time.time() + timeout
+        while len(child_pids(proc.pid)) < n_workers and time.time() < deadline:
+            time.sleep(0.5)
+        time.sleep(2)
+
+        master = read_memory_kb(proc.pid)
+        workers = [read_memory_kb(pid) for pid in child_pids(proc.pid)]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+    return {"master": master, "workers": workers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker RSS/PSS for preloaded gunicorn workers.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to measure.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind the benchmark server to.")
+    parser.add_argument("--timeout", type=float, default=180, help="Seconds to wait for startup.")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'master RSS':>11} {'worker RSS':>11} {'worker PSS':>11} {'total PSS':>10}  (MiB, worker values averaged)")
+    for n in args.workers:
+        result = measure(n, args.port, args.timeout)
+        workers = result["workers"]
+        avg_rss = sum(w["rss"] for w in workers) / max(len(workers), 1) / 1024
+        avg_pss = sum(w["pss"] for w in workers) / max(len(workers), 1) / 1024
+        total_pss = (result["master"]["pss"] + sum(w["pss"] for w in workers)) / 1024
+        print(f"{n:>7} {result['master']['rss'] / 1024:>11.1f} {avg_rss:>11.1f} {avg_pss:>11.1f} {total_pss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,17 @@ CONFIG = {
     "CHUNK_TOKENS": int(os.getenv("CHUNK_TOKENS", 512)),
     "CHUNK_OVERLAP": int(os.getenv("CHUNK_OVERLAP", 64)),
     "CHUNK_MIN_TOKENS": int(os.getenv("CHUNK_MIN_TOKENS", 388)), 
+    "TABLE_CHUNK_MODE": os.getenv("TABLE_CHUNK_MODE", "pack"),
+    "CHUNK_MERGE_SMALL": os.getenv("CHUNK_MERGE_SMALL", "true").lower() in ("1", "true", "yes"),
     "EMBED_MODEL": os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+    "EMBED_WORKERS": int(os.getenv("EMBED_WORKERS", 1)),
+    "EMBED_BATCH_SIZE": int(os.getenv("EMBED_BATCH_SIZE", 32)),
+    "EMBED_DTYPE": os.getenv("EMBED_DTYPE", "float32"),
+
+    "DEDUP_ENABLED": os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes"),
+    "DEDUP_THRESHOLD": float(os.getenv("DEDUP_THRESHOLD", 0.9)),
+    "DEDUP_NUM_PERM": int(os.getenv("DEDUP_NUM_PERM", 128)),
+    "DEDUP_SHINGLE_SIZE": int(os.getenv("DEDUP_SHINGLE_SIZE", 3)),
 
     "REDIS_HOST": os.getenv("REDIS_HOST"),
     "REDIS_PORT": int(os.getenv("REDIS_PORT", 6379)),
@@ -22,12 +32,41 @@ CONFIG = {
 
     "OLLAMA_URL": os.getenv("OLLAMA_URL", "http://localhost:11434"),
 
+    "WEB_CONCURRENCY": int(os.getenv("WEB_CONCURRENCY", 2)),
+    "TORCH_NUM_THREADS": int(os.getenv("TORCH_NUM_THREADS", 1)),
+
+    "UPLOAD_DIR": os.getenv("UPLOAD_DIR", "files/uploads"),
+    "INGEST_CONCURRENCY": int(os.getenv("INGEST_CONCURRENCY", 1)),
+    "INGEST_NICE": int(os.getenv("INGEST_NICE", 10)),
+    "INGEST_JOB_TTL": int(os.getenv("INGEST_JOB_TTL", 7 * 24 * 3600)),
+    "MAX_UPLOAD_MB": int(os.getenv("MAX_UPLOAD_MB", 50)),
+
 }
 
 # Shared tokenizer / models
 TOKENIZER = AutoTokenizer.from_pretrained(CONFIG["BERT_TOKENIZER"], use_fast=True)
 EMBEDDER = SentenceTransformer(CONFIG["EMBED_MODEL"])
-MLM_MODEL = BertForMaskedLM.from_pretrained(CONFIG["BERT_TOKENIZER"])
+_MLM_MODEL = None
+
+
+def _inference_mode(model):
+    # eval() disables dropout so outputs are deterministic, and
+    # requires_grad_(False) stops autograd from recording graphs or allocating
+    # gradient buffers for the weights on every request.
+    model.eval()
+    model.requires_grad_(False)
+    return model
+
+
+def get_mlm_model():
+    """Load BertForMaskedLM on first use, so ingestion-only processes never load it."""
+    global _MLM_MODEL
+    if _MLM_MODEL is None:
+        _MLM_MODEL = _inference_mode(BertForMaskedLM.from_pretrained(CONFIG["BERT_TOKENIZER"]))
+    return _MLM_MODEL
+
+
+_inference_mode(EMBEDDER)
 REDIS_HOST = CONFIG["REDIS_HOST"]
 REDIS_PORT = CONFIG["REDIS_PORT"]
 REDIS_PASSWORD = CONFIG["REDIS_PASSWORD"]
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for multi-worker serving of main:app.
+
+The app (and with it every model in config.py) is imported once in the master
+process with preload_app, then forked into Uvicorn workers that share the
+weights copy-on-write. Run with:
+
+    gunicorn main:app -c gunicorn.conf.py
+"""
+import gc
+import os
+
+from config import CONFIG
+
+bind = os.getenv("BIND", "127.0.0.1:8000")
+workers = CONFIG["WEB_CONCURRENCY"]
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+
+def when_ready(server):
+    # Runs once in the master after preload, before any worker is forked. Move
+    # everything loaded so far into the permanent generation so the cyclic GC in
+    # the workers never touches (and un-shares) those objects' pages. The GC is
+    # disabled first so no collection runs between here and the forks.
+    gc.disable()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    # One intra-op thread pool per worker; N workers x all cores oversubscribes the box.
+    import torch
+    torch.set_num_threads(CONFIG["TORCH_NUM_THREADS"])
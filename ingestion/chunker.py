@@ -1,12 +1,27 @@
-from typing import List
-from config import TOKENIZER, CONFIG
+from typing import List, Tuple
+from config import TOKENIZER, EMBEDDER, CONFIG
+from ingestion.dedup import ChunkDeduplicator
 import re
 
 class MarkdownChunker:
-    def __init__(self):
+    def __init__(self, table_mode: str = None, merge_small: bool = None):
         self.tokenizer = TOKENIZER
         self.max_tokens = CONFIG["CHUNK_TOKENS"]
         self.overlap = CONFIG["CHUNK_OVERLAP"]
+        # Packed and merged chunks must fit the embedder's window (minus [CLS]/[SEP]);
+        # anything past it is truncated and never reaches the vector
+        self.pack_tokens = min(self.max_tokens, EMBEDDER.max_seq_length - 2)
+        self.min_tokens = min(CONFIG["CHUNK_MIN_TOKENS"], self.pack_tokens)
+        if self.min_tokens < CONFIG["CHUNK_MIN_TOKENS"]:
+            print(f"Warning: CHUNK_MIN_TOKENS={CONFIG['CHUNK_MIN_TOKENS']} exceeds the embedder window; "
+                  f"merging small chunks up to {self.min_tokens} tokens instead.")
+        # "pack": rows packed up to pack_tokens, header once per chunk
+        # "row": one chunk per table row
+        self.table_mode = table_mode or CONFIG["TABLE_CHUNK_MODE"]
+        if self.table_mode not in ("pack", "row"):
+            raise ValueError(f"Unknown table chunk mode '{self.table_mode}'. Use 'pack' or 'row'.")
+        # Merging undersized prose and table chunks is independent of the table mode
+        self.merge_small = CONFIG["CHUNK_MERGE_SMALL"] if merge_small is None else merge_small
 
     def chunk_tokens(self, token_ids: List[int]) -> List[List[int]]:
         chunks = []
@@ -45,44 +60,134 @@ class MarkdownChunker:
             blocks.append('\n'.join(cur_block).strip())
         return blocks
 
+    def _decode(self, token_ids: List[int]) -> str:
+        return self.tokenizer.decode(token_ids, clean_up_tokenization_spaces=True).strip()
+
+    def split_table(self, block: str) -> Tuple[List[List[int]], List[List[int]]]:
+        """Split a table block into (header row token ids, body row token ids)."""
+        rows = block.split('\n')
+        header_rows = []
+        start_idx = 0
+        if rows:
+            first_cols = [c.strip() for c in rows[0].split('|')]
+            if "" in first_cols and len(rows) > 1:
+                header_rows = rows[:2]
+                start_idx = 2
+            else:
+                header_rows = [rows[0]]
+                start_idx = 1
+
+        header = [self.tokenizer.encode(hr, add_special_tokens=False) for hr in header_rows]
+        body = [self.tokenizer.encode(row, add_special_tokens=False) for row in rows[start_idx:]]
+        return header, body
+
+    def split_long_row(self, header_tokens: List[int], row_tokens: List[int], budget: int) -> List[str]:
+        """Split a row that does not fit next to its header into several header-prefixed chunks of at most budget tokens."""
+        chunks = []
+        window = max(1, budget - len(header_tokens))
+        step = window - self.overlap if window > self.overlap else window
+        start = 0
+        while start < len(row_tokens):
+            chunk_ids = header_tokens + row_tokens[start:start + window]
+            chunks.append(self._decode(chunk_ids))
+            start += step
+        return chunks
+
+    def table_chunks_by_row(self, block: str) -> List[str]:
+        """One chunk per body row, each prefixed with the header."""
+        header, body = self.split_table(block)
+        header_tokens = [t for hr in header for t in hr]
+        chunks = []
+        for row_tokens in body:
+            if len(header_tokens) + len(row_tokens) <= self.max_tokens:
+                chunks.append(self._decode(header_tokens + row_tokens))
+            else:
+                chunks.extend(self.split_long_row(header_tokens, row_tokens, self.max_tokens))
+        return chunks
+
+    def table_chunks_packed(self, block: str) -> List[str]:
+        """Pack as many consecutive rows as fit under pack_tokens, with the header once per chunk."""
+        header, body = self.split_table(block)
+        header_tokens = [t for hr in header for t in hr]
+        header_text = [self._decode(hr) for hr in header]
+        chunks = []
+        cur_rows = []
+        cur_len = len(header_tokens)
+
+        def flush():
+            if cur_rows:
+                chunks.append('\n'.join(header_text + [self._decode(r) for r in cur_rows]))
+
+        for row_tokens in body:
+            if len(header_tokens) + len(row_tokens) > self.pack_tokens:
+                flush()
+                cur_rows, cur_len = [], len(header_tokens)
+                chunks.extend(self.split_long_row(header_tokens, row_tokens, self.pack_tokens))
+            elif cur_len + len(row_tokens) > self.pack_tokens:
+                flush()
+                cur_rows, cur_len = [row_tokens], len(header_tokens) + len(row_tokens)
+            else:
+                cur_rows.append(row_tokens)
+                cur_len += len(row_tokens)
+        flush()
+
+        # A table with only a header still yields one chunk
+        if not body and header_tokens:
+            chunks.append('\n'.join(header_text))
+        return chunks
+
+    def merge_small_chunks(self, chunks: List[str], metadata: List[dict] = None) -> Tuple[List[str], List[dict]]:
+        """
+        Merge neighbouring chunks when either is under min_tokens and the result fits pack_tokens.
+        Runs as a separate step after de-duplication, so short repeated chunks are still
+        recognised as duplicates before they are merged into different neighbours.
+        Numeric metadata of merged chunks is summed and list metadata concatenated.
+        Disabled with CHUNK_MERGE_SMALL=false.
+        """
+        if metadata is None:
+            metadata = [{} for _ in chunks]
+        if not self.merge_small or not chunks:
+            return chunks, metadata
+
+        counts = [len(ids) for ids in self.tokenizer(chunks, add_special_tokens=False)["input_ids"]]
+        merged = []
+        for text, n_tokens, meta in zip(chunks, counts, metadata):
+            if merged:
+                prev_text, prev_tokens, prev_meta = merged[-1]
+                undersized = prev_tokens < self.min_tokens or n_tokens < self.min_tokens
+                if undersized and prev_tokens + n_tokens <= self.pack_tokens:
+                    merged[-1] = (prev_text + '\n\n' + text, prev_tokens + n_tokens, self._merge_meta(prev_meta, meta))
+                    continue
+            merged.append((text, n_tokens, dict(meta)))
+
+        return [text for text, _, _ in merged], [meta for _, _, meta in merged]
+
+    @staticmethod
+    def _merge_meta(a: dict, b: dict) -> dict:
+        out = dict(a)
+        for key, value in b.items():
+            if key in out and isinstance(value, list):
+                # Keep list metadata (e.g. alias previews) as bounded as dedup left it
+                out[key] = (out[key] + value)[:ChunkDeduplicator.MAX_PREVIEWS]
+            elif key in out and isinstance(value, (int, float)):
+                out[key] = out[key] + value
+            else:
+                out.setdefault(key, value)
+        return out
+
     def markdown_to_chunks(self, md_text: str) -> List[str]:
         blocks = self.split_blocks(md_text)
         all_chunks = []
 
         for block in blocks:
             if '|' in block:
-                rows = block.split('\n')
-
-                header_tokens = []
-                start_idx = 0
-                if rows:
-                    first_cols = [c.strip() for c in rows[0].split('|')]
-                    if "" in first_cols and len(rows) > 1:
-                        header_rows = rows[:2]
-                        start_idx = 2
-                    else:
-                        header_rows = [rows[0]]
-                        start_idx = 1
-
-                    for hr in header_rows:
-                        header_tokens.extend(self.tokenizer.encode(hr, add_special_tokens=False))
-
-                # Process remaining rows
-                for row in rows[start_idx:]:
-                    row_tokens = self.tokenizer.encode(row, add_special_tokens=False)
-                    if len(header_tokens) + len(row_tokens) <= self.max_tokens:
-                        chunk_ids = header_tokens + row_tokens
-                        all_chunks.append(self.tokenizer.decode(chunk_ids, clean_up_tokenization_spaces=True).strip())
-                    else:
-                        start = 0
-                        while start < len(row_tokens):
-                            end = start + (self.max_tokens - len(header_tokens))
-                            chunk_ids = header_tokens + row_tokens[start:end]
-                            all_chunks.append(self.tokenizer.decode(chunk_ids, clean_up_tokenization_spaces=True).strip())
-                            start += self.max_tokens - self.overlap
+                if self.table_mode == "pack":
+                    all_chunks.extend(self.table_chunks_packed(block))
+                else:
+                    all_chunks.extend(self.table_chunks_by_row(block))
             else:
                 block_tokens = self.tokenizer.encode(block, add_special_tokens=False)
                 for chunk_ids in self.chunk_tokens(block_tokens):
-                    all_chunks.append(self.tokenizer.decode(chunk_ids, clean_up_tokenization_spaces=True).strip())
+                    all_chunks.append(self._decode(chunk_ids))
 
         return all_chunks
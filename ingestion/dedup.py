@@ -0,0 +1,115 @@
+from typing import List, Tuple
+import re
+import zlib
+import numpy as np
+from config import CONFIG
+
+
+class ChunkDeduplicator:
+    """
+    Near-duplicate chunk elimination with MinHash + LSH banding over word shingles.
+    The first occurrence of a group of similar chunks is kept as canonical; the dropped
+    copies are recorded on it as an alias count and short text previews.
+    """
+
+    PREVIEW_CHARS = 100
+    MAX_PREVIEWS = 5
+
+    def __init__(self, threshold: float = None, num_perm: int = None, shingle_size: int = None, seed: int = 1):
+        self.threshold = threshold if threshold is not None else CONFIG["DEDUP_THRESHOLD"]
+        self.num_perm = num_perm or CONFIG["DEDUP_NUM_PERM"]
+        self.shingle_size = shingle_size or CONFIG["DEDUP_SHINGLE_SIZE"]
+        self.bands, self.rows = self._lsh_params(self.threshold, self.num_perm)
+
+        # Multiply-shift hash family: odd 64-bit multipliers, top 32 bits kept
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=self.num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def _lsh_params(threshold: float, num_perm: int, recall: float = 0.99) -> Tuple[int, int]:
+        """
+        Pick bands x rows <= num_perm so that a pair exactly at the threshold becomes a
+        candidate with probability >= recall, and among those the fewest false positive
+        candidates. Candidates are verified with exact Jaccard, so extra candidates only
+        cost comparisons while missed ones are duplicates that get embedded.
+        """
+        def fp_area(bands, rows, steps=200):
+            step = threshold / steps
+            return sum(1 - (1 - ((i + 0.5) * step) ** rows) ** bands for i in range(steps)) * step
+
+        best, best_err = (num_perm, 1), float("inf")
+        for bands in range(1, num_perm + 1):
+            for rows in range(1, num_perm // bands + 1):
+                if 1 - (1 - threshold ** rows) ** bands < recall:
+                    continue
+                err = fp_area(bands, rows)
+                if err < best_err:
+                    best, best_err = (bands, rows), err
+        return best
+
+    def shingles(self, text: str) -> set:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, shingle_set: set) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+        # uint64 arithmetic wraps mod 2**64, which is what multiply-shift hashing relies on
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0)
+
+    def deduplicate(self, chunks: List[str]) -> Tuple[List[str], List[dict]]:
+        """
+        Return (kept_chunks, metadata) where metadata[i] holds the number of near-duplicates
+        kept_chunks[i] replaced and previews of up to MAX_PREVIEWS of them.
+        """
+        buckets = {}
+        kept, metadata = [], []
+        shingle_sets = []
+        saved_chars = 0
+
+        for text in chunks:
+            sh = self.shingles(text)
+            if not sh:
+                kept.append(text)
+                metadata.append({"alias_count": 0, "alias_previews": []})
+                shingle_sets.append(sh)
+                continue
+
+            sig = self.signature(sh)
+            band_keys = [(b, sig[b * self.rows:(b + 1) * self.rows].tobytes()) for b in range(self.bands)]
+
+            canonical = None
+            for key in band_keys:
+                for cand in buckets.get(key, ()):
+                    cand_sh = shingle_sets[cand]
+                    # Verify LSH candidates with exact Jaccard similarity
+                    if len(sh & cand_sh) / len(sh | cand_sh) >= self.threshold:
+                        canonical = cand
+                        break
+                if canonical is not None:
+                    break
+
+            if canonical is not None:
+                meta = metadata[canonical]
+                meta["alias_count"] += 1
+                if len(meta["alias_previews"]) < self.MAX_PREVIEWS:
+                    meta["alias_previews"].append(text[:self.PREVIEW_CHARS])
+                saved_chars += len(text)
+                continue
+
+            pos = len(kept)
+            kept.append(text)
+            metadata.append({"alias_count": 0, "alias_previews": []})
+            shingle_sets.append(sh)
+            for key in band_keys:
+                buckets.setdefault(key, []).append(pos)
+
+        removed = len(chunks) - len(kept)
+        pct = 100.0 * removed / len(chunks) if chunks else 0.0
+        print(f"Dedup: kept {len(kept)} of {len(chunks)} chunks, removed {removed} near-duplicates "
+              f"({pct:.1f}% fewer embeddings, {saved_chars} chars saved, threshold={self.threshold}).")
+        return kept, metadata
@@ -0,0 +1,147 @@
+import os
+import socket
+import time
+import uuid
+
+import redis
+
+from config import CONFIG
+
+JOB_KEY_PREFIX = "ingest:job:"
+JOB_INDEX_KEY = "ingest:jobs"
+# Uploads live on the local disk of the host that received them, so each host has
+# its own FIFO of job ids waiting for its ingest worker service, and its own list of
+# ids the worker has taken but not finished (used to recover after a worker crash).
+HOSTNAME = socket.gethostname()
+QUEUE_KEY = f"ingest:queue:{HOSTNAME}"
+PROCESSING_KEY = f"ingest:processing:{HOSTNAME}"
+NUMERIC_FIELDS = ("progress", "created_at", "started_at", "finished_at", "updated_at")
+
+
+def redis_client() -> redis.Redis:
+    return redis.Redis(
+        host=CONFIG["REDIS_HOST"],
+        port=CONFIG["REDIS_PORT"],
+        password=CONFIG["REDIS_PASSWORD"],
+        decode_responses=True
+    )
+
+
+def remove_upload(pdf_path: str):
+    try:
+        os.remove(pdf_path)
+    except OSError:
+        pass
+
+
+def mark_failed(client: redis.Redis, job_id: str, error: str):
+    """Record a terminal failure for a job and delete its uploaded file."""
+    key = JOB_KEY_PREFIX + job_id
+    pdf_path = client.hget(key, "pdf_path")
+    client.hset(key, mapping={"status": "failed", "error": error, "finished_at": time.time()})
+    if pdf_path:
+        remove_upload(pdf_path)
+
+
+def run_ingest_job(job_id: str, pdf_path: str):
+    """Ingestion process entrypoint. Writes stage/progress/result to the job's Redis hash."""
+    client = None
+    key = JOB_KEY_PREFIX + job_id
+    try:
+        from ingestion.pipeline import PDFIngestPipeline
+
+        client = redis_client()
+
+        def progress(stage: str, fraction: float):
+            client.hset(key, mapping={"stage": stage, "progress": fraction, "updated_at": time.time()})
+
+        client.hset(key, mapping={"status": "running", "started_at": time.time()})
+        pipeline = PDFIngestPipeline(pdf_path)
+        chunks = pipeline.run(progress=progress)
+        client.hset(key, mapping={
+            "status": "done" if chunks else "failed",
+            "doc_id": pipeline.doc_id,
+            "chunks": chunks,
+            "error": "" if chunks else "No chunks were ingested from the document.",
+            "finished_at": time.time()
+        })
+    except Exception as e:
+        print(f"Ingestion job {job_id} failed: {e}")
+        if client is not None:
+            client.hset(key, mapping={"status": "failed", "error": str(e), "finished_at": time.time()})
+        raise
+    finally:
+        remove_upload(pdf_path)
+
+
+class IngestJobQueue:
+    """
+    API-side handle on the ingestion queue. Uploads are recorded in Redis and
+    pushed onto this host's queue, which the ingest worker service on the same
+    host (`python -m ingestion.worker`) consumes, so ingestion never runs on the
+    API request path and INGEST_CONCURRENCY caps ingestion for the whole host.
+    """
+
+    def __init__(self, upload_dir: str = None):
+        self.upload_dir = upload_dir or CONFIG["UPLOAD_DIR"]
+        self.job_ttl = CONFIG["INGEST_JOB_TTL"]
+        self.redis_client = redis_client()
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+    def new_upload_path(self, filename: str) -> tuple:
+        """Return (job_id, path) for storing an uploaded file before it is enqueued."""
+        job_id = uuid.uuid4().hex
+        stem = os.path.splitext(os.path.basename(filename or "document.pdf"))[0] or "document"
+        return job_id, os.path.join(self.upload_dir, f"{stem}_{job_id[:6]}.pdf")
+
+    def submit(self, job_id: str, pdf_path: str, filename: str) -> dict:
+        """Record the job as queued and push it onto the ingest queue. Deletes the upload if that fails."""
+        key = JOB_KEY_PREFIX + job_id
+        job = {
+            "job_id": job_id,
+            "filename": filename,
+            "pdf_path": os.path.abspath(pdf_path),
+            "host": HOSTNAME,
+            "status": "queued",
+            "stage": "queued",
+            "progress": 0.0,
+            "created_at": time.time()
+        }
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, mapping=job)
+            pipe.expire(key, self.job_ttl)
+            pipe.lpush(JOB_INDEX_KEY, job_id)
+            pipe.ltrim(JOB_INDEX_KEY, 0, 999)
+            pipe.lpush(QUEUE_KEY, job_id)
+            pipe.execute()
+        except Exception:
+            remove_upload(pdf_path)
+            raise
+        job.pop("pdf_path")
+        return job
+
+    @staticmethod
+    def _to_public(job: dict) -> dict:
+        if not job:
+            return None
+        job.pop("pdf_path", None)
+        for field in NUMERIC_FIELDS:
+            if field in job:
+                job[field] = float(job[field])
+        if "chunks" in job:
+            job["chunks"] = int(job["chunks"])
+        return job
+
+    def get(self, job_id: str) -> dict:
+        """Return the job's state, or None if it is unknown or expired."""
+        return self._to_public(self.redis_client.hgetall(JOB_KEY_PREFIX + job_id))
+
+    def list(self, limit: int = 20) -> list:
+        """Return up to limit of the most recently submitted jobs that have not expired."""
+        job_ids = self.redis_client.lrange(JOB_INDEX_KEY, 0, max(limit, 1) - 1)
+        pipe = self.redis_client.pipeline()
+        for job_id in job_ids:
+            pipe.hgetall(JOB_KEY_PREFIX + job_id)
+        jobs = [self._to_public(job) for job in pipe.execute()]
+        return [job for job in jobs if job]
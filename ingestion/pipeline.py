@@ -4,10 +4,12 @@ import sys
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
-from parser import PDFParser
-from chunker import MarkdownChunker
-from embedder import Embedder
-from store import PineconeClient
+from ingestion.parser import PDFParser
+from ingestion.chunker import MarkdownChunker
+from ingestion.dedup import ChunkDeduplicator
+from ingestion.embedder import Embedder
+from ingestion.store import PineconeClient
+from config import CONFIG
 
 class PDFIngestPipeline:
     """
@@ -15,11 +17,13 @@ class PDFIngestPipeline:
     1. Parse PDF -> Markdown
     2. Clean text
     3. Tokenize and chunk into semantic + token-aware chunks
-    4. Embed chunks
-    5. Upsert embeddings + metadata into Pinecone
+    4. Drop near-duplicate chunks (optional)
+    5. Merge undersized chunks
+    6. Embed chunks
+    7. Upsert embeddings + metadata into Pinecone
     """
 
-    def __init__(self, pdf_path: str = None):
+    def __init__(self, pdf_path: str = None, embed_workers: int = None, embed_dtype: str = None):
         if pdf_path is None:
             self.pdf_path = pathlib.Path(__file__).resolve().parents[0] / "files" / "input.pdf"
         else:
@@ -29,37 +33,56 @@ class PDFIngestPipeline:
 
         self.parser = PDFParser(str(self.pdf_path))
         self.chunker = MarkdownChunker()
-        self.embedder = Embedder()
+        self.deduplicator = ChunkDeduplicator() if CONFIG["DEDUP_ENABLED"] else None
+        self.embedder = Embedder(workers=embed_workers, dtype=embed_dtype)
         self.store = PineconeClient()
 
-    def run(self):
-        """Run the full pipeline and return number of chunks ingested."""
+    def run(self, progress=None):
+        """
+        Run the full pipeline and return number of chunks ingested.
+        progress, if given, is called as progress(stage, fraction) as each step starts.
+        """
+        report = progress or (lambda stage, fraction: None)
+
+        report("parsing", 0.0)
         raw_md = self.parser.extract_to_markdown()
         if not raw_md:
             print("Failed to extract markdown from PDF.")
             return 0
 
+        report("chunking", 0.3)
         cleaned_md = self.parser.clean_markdown()
         chunks = self.chunker.markdown_to_chunks(cleaned_md)
         if not chunks:
             print("No chunks extracted.")
             return 0
 
+        chunk_meta = None
+        if self.deduplicator is not None:
+            report("deduplicating", 0.35)
+            chunks, chunk_meta = self.deduplicator.deduplicate(chunks)
+
+        # Merge undersized chunks only after dedup, so short boilerplate is still caught
+        chunks, chunk_meta = self.chunker.merge_small_chunks(chunks, chunk_meta)
+
+        report("embedding", 0.4)
         vectors = self.embedder.embed_chunks(chunks)
         dim = vectors[0].shape[0] if len(vectors) > 0 else 0
         if dim == 0:
             print("Embeddings have zero dimension.")
             return 0
 
+        report("upserting", 0.9)
         self.store.ensure_index(dim)
-        self.store.upsert_chunks(vectors, chunks, self.doc_id)
+        self.store.upsert_chunks(vectors, chunks, self.doc_id, metadata=chunk_meta)
 
+        report("done", 1.0)
         print(f"Ingested {len(chunks)} chunks into Pinecone index '{self.store.index_name}' for doc_id '{self.doc_id}'.")
         return len(chunks)
 
 
-def ingest_pdf_to_pinecone(pdf_path: str = None):
-    pipeline = PDFIngestPipeline(pdf_path)
+def ingest_pdf_to_pinecone(pdf_path: str = None, embed_workers: int = None, embed_dtype: str = None):
+    pipeline = PDFIngestPipeline(pdf_path, embed_workers=embed_workers, embed_dtype=embed_dtype)
     return pipeline.run()
 
 
@@ -68,7 +91,9 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Ingest a PDF into Pinecone.")
     parser.add_argument("pdf_path", nargs="?", default="files/input.pdf", help="Path to the PDF file to ingest.")
+    parser.add_argument("--embed-workers", type=int, default=None, help="Embedding worker processes (defaults to EMBED_WORKERS).")
+    parser.add_argument("--embed-dtype", choices=["float32", "float16"], default=None, help="Embedding array dtype (defaults to EMBED_DTYPE).")
     args = parser.parse_args()
 
-    ingested_count = ingest_pdf_to_pinecone(args.pdf_path)
+    ingested_count = ingest_pdf_to_pinecone(args.pdf_path, embed_workers=args.embed_workers, embed_dtype=args.embed_dtype)
     print(f"Total chunks ingested: {ingested_count}")
@@ -34,8 +34,11 @@ class PineconeClient:
                     f"but your embeddings are {dim}d. Either change your embedding model or create a new index."
                 )
 
-    def upsert_chunks(self, vectors: list, chunks: list, doc_id: str):
-        """Upload embeddings and corresponding text chunks to Pinecone index."""
+    def upsert_chunks(self, vectors: list, chunks: list, doc_id: str, metadata: list = None):
+        """
+        Upload embeddings and corresponding text chunks to Pinecone index.
+        metadata, if given, holds one dict of extra fields per chunk (e.g. dedup aliases).
+        """
         index = self.pc.Index(self.index_name)
         items = []
 
@@ -50,6 +53,9 @@ class PineconeClient:
                 "chunk_index": i,
                 "text": text
             }
+            if metadata is not None:
+                # Extra fields never replace the ones that identify the vector
+                meta.update({k: v for k, v in metadata[i].items() if k not in meta})
             items.append((uid, vec.tolist(), meta))
 
         index.upsert(vectors=items)
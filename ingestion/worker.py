@@ -0,0 +1,184 @@
+"""
+Ingest worker service: the single consumer of this host's ingestion queue.
+
+Uploads are stored on the disk of the API host that received them, so queues are
+scoped by hostname and every host that serves the API runs exactly one of these:
+
+    python -m ingestion.worker
+
+Models are loaded once here and ingestion processes are forked from this
+process, so they share the weights copy-on-write. At most INGEST_CONCURRENCY
+jobs run at a time on the host, however many API workers enqueue them.
+"""
+import os
+import sys
+import signal
+import threading
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import CONFIG
+from ingestion.jobs import (
+    JOB_KEY_PREFIX,
+    QUEUE_KEY,
+    PROCESSING_KEY,
+    HOSTNAME,
+    redis_client,
+    mark_failed,
+    run_ingest_job,
+)
+
+
+def _init_worker():
+    """Runs once in each ingestion process: yield CPU to the API and keep torch to a few threads."""
+    os.nice(CONFIG["INGEST_NICE"])
+    import torch
+    torch.set_num_threads(CONFIG["TORCH_NUM_THREADS"])
+
+
+LOCK_KEY = f"ingest:worker:{HOSTNAME}"
+LOCK_TTL = 30
+
+
+class IngestWorker:
+    """Pulls job ids off this host's Redis queue and runs them in a process pool, one slot per job."""
+
+    def __init__(self, concurrency: int = None, poll_timeout: int = 5):
+        self.concurrency = concurrency or CONFIG["INGEST_CONCURRENCY"]
+        self.poll_timeout = poll_timeout
+        self.redis_client = redis_client()
+        # Only take a job off the queue when a slot is free, so waiting jobs stay in Redis
+        self.slots = threading.Semaphore(self.concurrency)
+        self.stopping = threading.Event()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.lock_token = uuid.uuid4().hex
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # fork shares this process's already-loaded models with the ingestion processes
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.concurrency,
+                    mp_context=multiprocessing.get_context("fork"),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor):
+        """Drop a broken pool (e.g. after an ingestion process was OOM-killed); the next job builds a new one."""
+        with self._executor_lock:
+            # Several futures of the same broken pool report in; only the first replaces it
+            if self._executor is not broken:
+                return
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def acquire_lock(self) -> bool:
+        """Take (or refresh) this host's worker lease, so only one worker consumes the host's queue."""
+        if self.redis_client.set(LOCK_KEY, self.lock_token, nx=True, ex=LOCK_TTL):
+            return True
+        if self.redis_client.get(LOCK_KEY) == self.lock_token:
+            self.redis_client.expire(LOCK_KEY, LOCK_TTL)
+            return True
+        return False
+
+    def release_lock(self):
+        if self.redis_client.get(LOCK_KEY) == self.lock_token:
+            self.redis_client.delete(LOCK_KEY)
+
+    def recover(self):
+        """
+        Fail jobs a previous worker on this host took but never finished, rather than
+        retrying a job that may crash again. Other hosts' jobs are never touched.
+        """
+        for job_id in self.redis_client.lrange(PROCESSING_KEY, 0, -1):
+            status = self.redis_client.hget(JOB_KEY_PREFIX + job_id, "status")
+            if status in ("queued", "running"):
+                mark_failed(self.redis_client, job_id, "Ingest worker stopped before the job finished.")
+            self.redis_client.lrem(PROCESSING_KEY, 0, job_id)
+
+    def _finished(self, job_id: str, executor: ProcessPoolExecutor, future):
+        try:
+            if future.cancelled():
+                mark_failed(self.redis_client, job_id, "Job was cancelled by worker shutdown.")
+            else:
+                error = future.exception()
+                if isinstance(error, BrokenProcessPool):
+                    # The process died without running the job's own error handling
+                    mark_failed(self.redis_client, job_id, "Ingestion process exited unexpectedly.")
+                    self._reset_executor(executor)
+                elif error is not None and self.redis_client.hget(JOB_KEY_PREFIX + job_id, "status") != "failed":
+                    mark_failed(self.redis_client, job_id, str(error))
+            self.redis_client.lrem(PROCESSING_KEY, 0, job_id)
+        finally:
+            self.slots.release()
+
+    def _start(self, job_id: str):
+        pdf_path = self.redis_client.hget(JOB_KEY_PREFIX + job_id, "pdf_path")
+        if not pdf_path:
+            # Job hash expired while queued
+            self.redis_client.lrem(PROCESSING_KEY, 0, job_id)
+            self.slots.release()
+            return
+
+        executor = self.executor
+        try:
+            future = executor.submit(run_ingest_job, job_id, pdf_path)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            executor = self.executor
+            try:
+                future = executor.submit(run_ingest_job, job_id, pdf_path)
+            except Exception as e:
+                mark_failed(self.redis_client, job_id, f"Could not start ingestion: {e}")
+                self.redis_client.lrem(PROCESSING_KEY, 0, job_id)
+                self.slots.release()
+                return
+        future.add_done_callback(lambda f: self._finished(job_id, executor, f))
+
+    def run(self):
+        if not self.acquire_lock():
+            print(f"Another ingest worker is already running on {HOSTNAME}; exiting.")
+            sys.exit(1)
+        self.recover()
+        print(f"Ingest worker started on {HOSTNAME} with concurrency {self.concurrency}.")
+        while not self.stopping.is_set():
+            # The poll timeout is well under LOCK_TTL, so the lease is refreshed in time
+            if not self.acquire_lock():
+                print(f"Lost the ingest worker lease on {HOSTNAME}; stopping.")
+                break
+            if not self.slots.acquire(timeout=self.poll_timeout):
+                continue
+            job_id = self.redis_client.brpoplpush(QUEUE_KEY, PROCESSING_KEY, timeout=self.poll_timeout)
+            if job_id is None:
+                self.slots.release()
+                continue
+            self._start(job_id)
+        self.shutdown()
+
+    def shutdown(self):
+        """Let running jobs finish; anything cancelled is marked failed and its upload deleted."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            # Wait for running jobs to hand back their slots, keeping the lease alive so a
+            # replacement worker does not fail them in recover() while they still run
+            for _ in range(self.concurrency):
+                while not self.slots.acquire(timeout=self.poll_timeout):
+                    self.acquire_lock()
+            self._executor = None
+        self.release_lock()
+        print("Ingest worker stopped.")
+
+    def stop(self, *_):
+        self.stopping.set()
+
+
+if __name__ == "__main__":
+    worker = IngestWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
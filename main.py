@@ -1,14 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 import uuid
 import redis
 import json
+import os
 
 from retrieval import Retriever
 from generation import QAModel
 from mlm import MLMModel
-from config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD
+from ingestion.jobs import IngestJobQueue
+from config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, CONFIG
 
 r = redis.Redis(
     host=REDIS_HOST,
@@ -34,6 +37,21 @@ class ChatRequest(BaseModel):
 retriever = Retriever()
 qa_model = QAModel()
 mlm_model = MLMModel()
+ingest_queue = IngestJobQueue()
+MAX_UPLOAD_BYTES = CONFIG["MAX_UPLOAD_MB"] * 1024 * 1024
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from the Content-Length header, before Starlette buffers the body."""
+    if request.method == "POST" and request.url.path == "/documents":
+        content_length = request.headers.get("content-length")
+        if content_length is None:
+            return JSONResponse(status_code=411, content={"detail": "Content-Length header is required."})
+        if not content_length.isdigit() or int(content_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": f"Upload exceeds the {CONFIG['MAX_UPLOAD_MB']} MB limit."})
+    return await call_next(request)
 
 @app.get("/")
 def root():
@@ -80,4 +98,49 @@ def chat(req: ChatRequest):
         "session_id": session_id,
         "answer": answer,
         "history": prev_history
-    }
\ No newline at end of file
+    }
+
+@app.post("/documents", status_code=202)
+def upload_document(file: UploadFile = File(...)):
+    """Store an uploaded PDF and enqueue it for background ingestion."""
+    if not (file.filename or "").lower().endswith(".pdf") and file.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Only PDF uploads are supported.")
+
+    job_id, pdf_path = ingest_queue.new_upload_path(file.filename)
+    size = 0
+    with open(pdf_path, "wb") as out:
+        # The middleware has already bounded the request size; this enforces the exact
+        # file limit (the header also counts multipart framing) while copying out of
+        # Starlette's temporary file in blocks
+        while block := file.file.read(1024 * 1024):
+            size += len(block)
+            if size > MAX_UPLOAD_BYTES:
+                break
+            out.write(block)
+    if size > MAX_UPLOAD_BYTES:
+        os.remove(pdf_path)
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {CONFIG['MAX_UPLOAD_MB']} MB limit.")
+    if size == 0:
+        os.remove(pdf_path)
+        raise HTTPException(status_code=400, detail="Upload is empty.")
+
+    job = ingest_queue.submit(job_id, pdf_path, file.filename)
+    return job
+
+@app.get("/documents/jobs")
+def list_ingest_jobs(limit: int = Query(20, ge=1, le=100)):
+    return {"jobs": ingest_queue.list(limit=limit)}
+
+@app.get("/documents/jobs/{job_id}")
+def get_ingest_job(job_id: str):
+    job = ingest_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+@app.get("/documents/jobs/{job_id}/progress")
+def get_ingest_progress(job_id: str):
+    job = ingest_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {"job_id": job_id, "status": job.get("status"), "stage": job.get("stage"), "progress": job["progress"]}
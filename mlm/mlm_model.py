@@ -1,4 +1,4 @@
-from config import TOKENIZER, MLM_MODEL
+from config import TOKENIZER, get_mlm_model
 import torch
 
 class MLMModel:
@@ -6,7 +6,7 @@ class MLMModel:
 
     def __init__(self):
         self.tokenizer = TOKENIZER
-        self.model = MLM_MODEL
+        self.model = get_mlm_model()
 
     def predict_mask(self, text: str) -> str:
         """predicts word for [MASK]"""